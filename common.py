@@ -4,6 +4,8 @@ from dataclasses import dataclass
 class Party:
     """Represents a person or entity in the mortgage collaboration."""
 
+    __slots__ = ("name", "type", "ledger_strings", "ledger_exclusions", "exclusion_amount")
+
     def __init__(
         self, name: str, ledger_strings=None, ledger_exclusions=None, exclusion_amount = None, type: str = None
     ):
@@ -18,21 +20,40 @@ class Party:
         return f"Party(name={self.name}{', type=' + self.type if self.type else ''})"
 
 
-@dataclass
+# money compared or differenced at cent precision is held as integer cents
+Cents = int
+
+
+def to_cents(amount: float) -> Cents:
+    """Rounds a dollar amount to whole cents, the same way round(amount, 2) does."""
+    # round(amount, 2) rounds the exact binary value, so 2.675 (stored just below
+    # 2.675) gives 2.67, while round(2.675 * 100) would give 268. The already
+    # rounded value times 100 is within a hair of an integer, so it converts exactly.
+    return round(round(amount, 2) * 100)
+
+
+@dataclass(slots=True)
 class Parties:
     stakeholder: Party
     common_party: Party
 
 
-@dataclass
+@dataclass(slots=True)
 class LoanInfo:
     annual_rate: float
     total_periods: int
 
+    @property
+    def rate_per_period(self) -> float:
+        """Monthly rate, computed from annual_rate so it can't go stale."""
+        return self.annual_rate / 12.0
+
 
 class Payment:
     """Represents a financial transaction between two parties within a specific period."""
 
+    __slots__ = ("amount", "sender", "recipient", "period", "date")
+
     def __init__(self, amount: float, sender: Party, recipient: Party, period: int, date: str = None):
         if period < 0:
             raise ValueError("Period must be a non-negative integer.")
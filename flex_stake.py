@@ -1,5 +1,6 @@
 from typing import List, Dict
 import csv
+from dataclasses import dataclass
 from enum import Enum
 
 
@@ -9,11 +10,15 @@ class PaymentState(Enum):
 
 
 class Party:
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
 
 class Stakeholder(Party):
+    __slots__ = ("stakes",)
+
     def __init__(self, name: str):
         super().__init__(name)
         self.stakes: List[Stake] = []
@@ -23,6 +28,8 @@ class Stakeholder(Party):
 
 
 class Stake:
+    __slots__ = ("owner", "amount", "flex")
+
     def __init__(self, owner: Stakeholder, amount: float):
         self.owner = owner
         self.amount = amount
@@ -62,7 +69,6 @@ class Mortgage:
         return sum(stake.amount for stake in self.stakes)
 
     def generate_amortization_schedule(self) -> List["Payment"]:
-        payments = []
         monthly_rate = self.interest_rate / 12 / 100
         if monthly_rate > 0:
             monthly_payment = (self.total_amount * monthly_rate) / (
@@ -71,16 +77,10 @@ class Mortgage:
         else:
             monthly_payment = self.total_amount / self.num_payments
 
-        for i in range(self.num_payments):
-            payments.append(
-                Payment(
-                    amount=monthly_payment,
-                    sender=None,
-                    recipient=None,
-                    date=f"Month {i+1}",
-                    state=PaymentState.PLANNED,
-                )
-            )
+        payments = [
+            Payment(monthly_payment, None, None, f"Month {i+1}", PaymentState.PLANNED)
+            for i in range(self.num_payments)
+        ]
 
         return payments
 
@@ -95,20 +95,13 @@ mortgage = Mortgage(
 )
 
 
+@dataclass(slots=True)
 class Payment:
-    def __init__(
-        self,
-        amount: float,
-        sender: Party,
-        recipient: Party,
-        date: str,
-        state: PaymentState = PaymentState.PLANNED,
-    ):
-        self.amount = amount
-        self.sender = sender
-        self.recipient = recipient
-        self.date = date
-        self.state = state
+    amount: float
+    sender: Party
+    recipient: Party
+    date: str
+    state: PaymentState = PaymentState.PLANNED
 
 
 class PaymentRecord:
@@ -1,9 +1,12 @@
+import logging
 from property import Property, PropertyParams
 from common import Payment, Party, LoanInfo
 from datetime import datetime
 from ledger_reader import LedgerReader
 from loan import TableType
 
+logger = logging.getLogger(__name__)
+
 class LedgerProcessor:
     """
     Processes payments to update the Property class accordingly.
@@ -23,13 +26,14 @@ class LedgerProcessor:
 
         :param payment: A Payment instance containing transaction details.
         """
-        if payment.sender.name in self.property.mortgage_slices:
-            print(f"processing payment for {payment.sender.name}")
+        sender_name = payment.sender.name
+        if sender_name in self.property.mortgage_slices:
+            logger.debug("processing payment for %s", sender_name)
             result = self.property.accept_payment(
                 payment.sender, payment.amount, payment.period
             )
         else:
-            print(f"{payment.sender.name} not in {self.property.mortgage_slices}")
+            logger.debug("%s not in %s", sender_name, self.property.mortgage_slices)
 
     def process_payments(self, payments: list[Payment]):
         """
@@ -50,7 +54,7 @@ class LedgerProcessor:
                 self.property.advance_period()
                 current_period += 1
 
-            print(payment)
+            logger.debug("%s", payment)
 
             self.process_payment(payment)
 
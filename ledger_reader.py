@@ -1,34 +1,58 @@
 import csv
 import datetime
+import logging
+import re
 from typing import List
 from common import Party, Payment
 import math
 
+logger = logging.getLogger(__name__)
+
 def months_between(start_date: datetime, end_date: datetime) -> int:
     """Returns the number of months between two datetime objects."""
     return (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
 
+def _compile_matcher(strings):
+    """Returns a regex matching any of the lowercased strings, or None if there are none."""
+    if not strings:
+        return None
+    return re.compile("|".join(re.escape(s.lower()) for s in strings))
+
 class LedgerReader:
     def __init__(self, parties: List[Party], mutual_income_strings, first_period):
         self.parties = parties
         self.common_party = Party(name="Common Account", type="Common Party")
         self.first_period = first_period
         self.mutual_income_strings = mutual_income_strings
-        print(self.parties)
+        logger.debug("reading ledger for %s", self.parties)
+
+        # matching is case insensitive, lowercase and compile the match strings once up front
+        # so each description is scanned once per party instead of once per string
+        self._party_matchers = [
+            (
+                party,
+                _compile_matcher(party.ledger_strings),
+                _compile_matcher(party.ledger_exclusions),
+            )
+            for party in self.parties
+        ]
+        self._mutual_income_strings_lower = [s.lower() for s in self.mutual_income_strings]
 
     def parse_csv(self, file_path: str) -> List[Payment]:
         payments = []
+        common_party = self.common_party
+        identify_sender = self.identify_sender
+        # months_between inlined below, counted from the first period's month
+        first_month = self.first_period.year * 12 + self.first_period.month
 
         with open(file_path, newline="", encoding="utf-8") as csvfile:
             reader = csv.reader(
                 csvfile, delimiter="\t"
-            )  # Assuming tab-separated values
+            )  # Assuming tab-separated values, rows are streamed rather than loaded up front
 
             for row in reader:
-                print(row)
-
                 if len(row) < 4:
-                    print(f"skipping {row}")
+                    logger.debug("skipping %s", row)
                     continue  # Skip malformed rows
 
                 date_str, description, amount_str, balance_str = row
@@ -37,26 +61,28 @@ class LedgerReader:
 
 
                 try:
-                    transaction_date = datetime.datetime.strptime(date_str, "%m/%d/%Y").date()
+                    # dates are always MM/DD/YYYY, splitting is much cheaper than strptime
+                    month, day, year = map(int, date_str.split("/"))
+                    datetime.date(year, month, day)  # raises ValueError for invalid dates
                     amount_str = amount_str.replace(',','')
                     amount = float(amount_str)
                 except ValueError as e:
-                    print(f"skipping {row} because of {e}")
+                    logger.debug("skipping %s because of %s", row, e)
                     continue
 
-                period = months_between(self.first_period, transaction_date) + 1 # Assuming period is the month of the transaction
+                period = year * 12 + month - first_month + 1 # Assuming period is the month of the transaction
 
-                sender = self.identify_sender(description, amount)
+                sender = identify_sender(description, amount)
 
                 if sender:
-                    payment = Payment(amount, sender, self.common_party, period, date_str)
+                    payment = Payment(amount, sender, common_party, period, date_str)
                     payments.append(payment)
 
-                mutual_income = False
-
-                for marker_string in self.mutual_income_strings:
-                    if marker_string.lower() in description.lower():
-                        mutual_income = True
+                description_lower = description.lower()
+                mutual_income = any(
+                    marker_string in description_lower
+                    for marker_string in self._mutual_income_strings_lower
+                )
 
                 if mutual_income and sender:
                     raise Exception(f"transaction marked from {sender} also flagged as mutual income")
@@ -65,7 +91,7 @@ class LedgerReader:
                 if mutual_income:
                     number_mutual_parties = len(self.parties)
                     for party in self.parties:
-                        payment = Payment(amount/ number_mutual_parties, party, self.common_party, period, date_str)
+                        payment = Payment(amount/ number_mutual_parties, party, common_party, period, date_str)
                         payments.append(payment)
 
 
@@ -73,16 +99,11 @@ class LedgerReader:
 
     def identify_sender(self, description: str, amount: float) -> Party:
         identified_senders = []
+        description_lower = description.lower()
 
-        for party in self.parties:
-            excluded = False
-            for ledger_exclusion in party.ledger_exclusions:
-                if ledger_exclusion.lower() in description.lower():
-                    excluded = True
-            match = False
-            for ledger_string in party.ledger_strings:
-                if ledger_string.lower() in description.lower():
-                    match = True
+        for party, ledger_strings, ledger_exclusions in self._party_matchers:
+            excluded = bool(ledger_exclusions and ledger_exclusions.search(description_lower))
+            match = bool(ledger_strings and ledger_strings.search(description_lower))
             if match and party.exclusion_amount:
                 if abs(amount) < party.exclusion_amount:
                     excluded = True
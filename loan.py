@@ -1,9 +1,18 @@
+import functools
+import logging
+import os
 import numpy as np
 from common import Payment, Party, LoanInfo
-import copy
 from collections import namedtuple
 from enum import Enum
 
+# the numba kernel is opt in, set FAIR_FLEX_NUMBA=1 to use it. Importing numba
+# and dispatching to the kernel costs more than the NumPy path saves on
+# 360 period schedules, so NumPy is the default.
+USE_NUMBA = os.environ.get("FAIR_FLEX_NUMBA") == "1"
+
+logger = logging.getLogger(__name__)
+
 # Define a simple named tuple for payment details
 PaymentDetails = namedtuple(
     "PaymentDetails", ["total_payment", "principal", "interest", "remaining_balance"]
@@ -11,6 +20,173 @@ PaymentDetails = namedtuple(
 
 """General Utilities for Loans, used by mortgage slice"""
 
+def _amort_loop(principal, rate, total_periods, start_period, disc, extra_periods, extra_amounts, out):
+    """Fills out with (period, total_payment, principal, interest, extra, balance) rows.
+
+    disc[k - 1] is the discount factor (1 + rate) ** -k, extra_periods must be sorted
+    and extra_amounts holds the matching amounts.
+    """
+    if total_periods - start_period + 1 <= 0:
+        raise ZeroDivisionError("loan has no payment periods to pay off its principal")
+
+    for i in range(1, start_period):
+        out[i - 1, 0] = i
+        out[i - 1, 1:] = 0.0
+
+    balance = principal
+    payment = (rate * principal) / (1 - disc[total_periods - start_period])
+
+    e = 0
+    for i in range(start_period, total_periods + 1):
+        interest = balance * rate
+        principal_paid = payment - interest
+
+        while e < len(extra_periods) and extra_periods[e] < i:
+            e += 1
+        extra_payment = 0.0
+        if e < len(extra_periods) and extra_periods[e] == i:
+            extra_payment = extra_amounts[e]
+
+        balance -= principal_paid + extra_payment
+
+        out[i - 1, 0] = i
+        out[i - 1, 1] = payment
+        out[i - 1, 2] = principal_paid
+        out[i - 1, 3] = interest
+        out[i - 1, 4] = extra_payment
+        out[i - 1, 5] = balance
+
+        if extra_payment != 0:
+            remaining_payments = total_periods - i
+            if remaining_payments > 0:
+                payment = (rate * balance) / (1 - disc[remaining_payments - 1])
+
+
+def _compile_kernel():
+    """_amort_loop compiled with numba, raises ImportError if numba is not installed."""
+    from numba import njit
+
+    # no fastmath, the schedule is money checked to the cent against the NumPy path
+    return njit(cache=True)(_amort_loop)
+
+
+_amort_kernel = None
+if USE_NUMBA:
+    try:
+        _amort_kernel = _compile_kernel()
+    except ImportError:  # numba is optional, schedules fall back to plain NumPy
+        pass
+
+
+# loans sharing a LoanInfo share these, the arrays are read only
+@functools.lru_cache(maxsize=32)
+def _growth(rate, n):
+    """(1 + rate) ** k for k in 1..n, indexed by k - 1."""
+    growth = np.power(1 + rate, np.arange(1, n + 1))
+    growth.flags.writeable = False
+    return growth
+
+
+@functools.lru_cache(maxsize=32)
+def _discount(rate, n):
+    """(1 + rate) ** -k for k in 1..n, indexed by k - 1."""
+    discount = np.power(1 + rate, -np.arange(1, n + 1))
+    discount.flags.writeable = False
+    return discount
+
+
+def _payment(rate, principal, payment_periods, disc):
+    """Level payment that pays off principal over payment_periods, disc from _discount."""
+    if payment_periods <= 0:
+        raise ZeroDivisionError("loan has no payment periods to pay off its principal")
+    if payment_periods <= len(disc):
+        # a python float, so a zero rate raises ZeroDivisionError instead of returning nan
+        discount = float(disc[payment_periods - 1])
+    else:
+        discount = (1 + rate) ** -payment_periods
+    return (rate * principal) / (1 - discount)
+
+
+def _vectorized_schedule(principal, rate, total_periods, start_period, extra_payments):
+    """NumPy schedule, the default unless the numba kernel is enabled."""
+    growth = _growth(rate, total_periods)
+    disc = _discount(rate, total_periods)
+    balance = principal
+    payment = _payment(rate, principal, total_periods - start_period + 1, disc)
+
+    # periods before start_period stay zero
+    table = np.zeros((total_periods, 6), order="F")
+
+    # the payment is recalculated after every extra payment, so the schedule is
+    # split into segments ending on extra payment periods. Within a segment the
+    # balance follows the closed form B_k = B_0*(1+r)^k - M*((1+r)^k - 1)/r
+    extra_periods = sorted(
+        period
+        for period, amount in extra_payments.items()
+        if start_period <= period <= total_periods and amount != 0
+    )
+
+    segment_start = start_period
+    for segment_end in extra_periods + [total_periods]:
+        if segment_end < segment_start:
+            continue
+
+        segment_growth = growth[: segment_end - segment_start + 1]
+        balances = balance * segment_growth - payment * (segment_growth - 1) / rate
+
+        segment = table[segment_start - 1 : segment_end]
+        segment[:, 1] = payment
+        segment[:, 3] = np.concatenate(([balance], balances[:-1])) * rate
+        segment[:, 2] = payment - segment[:, 3]
+        segment[:, 5] = balances
+
+        extra_payment = extra_payments.get(segment_end, 0)
+        segment[-1, 4] = extra_payment
+        segment[-1, 5] -= extra_payment
+
+        balance = segment[-1, 5]
+        segment_start = segment_end + 1
+
+        remaining_payments = total_periods - segment_end
+        if extra_payment != 0 and remaining_payments > 0:
+            payment = _payment(rate, balance, remaining_payments, disc)
+
+    table[:, 0] = np.arange(1, total_periods + 1)
+    return table
+
+
+def _kernel_schedule(kernel, principal, rate, total_periods, start_period, extras):
+    """Schedule from a compiled _amort_loop, extras is a sorted tuple of (period, amount) pairs."""
+    extra_periods = np.array([period for period, _ in extras], dtype=np.int64)
+    extra_amounts = np.array([amount for _, amount in extras], dtype=np.float64)
+    table = np.empty((total_periods, 6), dtype=np.float64, order="F")
+    kernel(
+        principal,
+        rate,
+        total_periods,
+        start_period,
+        _discount(rate, total_periods),
+        extra_periods,
+        extra_amounts,
+        table,
+    )
+    return table
+
+
+# every adjustment makes a new extra payments key, so hits are mostly repeated
+# baseline and adjustment loans, and a small cache keeps few tables alive
+@functools.lru_cache(maxsize=64)
+def _amortize_cached(principal, rate, total_periods, start_period, extras):
+    """Read only schedule table, extras is a sorted tuple of (period, amount) pairs."""
+    if _amort_kernel is not None:
+        table = _kernel_schedule(_amort_kernel, principal, rate, total_periods, start_period, extras)
+    else:
+        table = _vectorized_schedule(principal, rate, total_periods, start_period, dict(extras))
+
+    table.flags.writeable = False
+    return table
+
+
 class TableType(Enum):
     FULL = "Full"
     SIDELOAN = "Sideloan"
@@ -22,12 +198,62 @@ class AmortizationTable:
     Represents an amortization schedule as a structured table.
     """
 
+    __slots__ = ("array",)
+
     def __init__(self, schedule):
-        self.schedule = schedule  # List of tuples [(period, total_payment, principal, interest, extra, balance), ...]
+        # rows of (period, total_payment, principal, interest, extra, balance),
+        # accepts a list of tuples or an ndarray. Stored column-major so each
+        # column is a contiguous float64 array.
+        self.array = np.asfortranarray(
+            np.asarray(schedule, dtype=np.float64).reshape(-1, 6)
+        )
+
+    @property
+    def schedule(self):
+        """Rows as a list of lists, kept for callers that iterate the table in Python."""
+        return self.array.tolist()
+
+    @property
+    def period(self):
+        return self.array[:, 0]
+
+    @property
+    def total_payment(self):
+        return self.array[:, 1]
+
+    @property
+    def principal(self):
+        return self.array[:, 2]
+
+    @property
+    def interest(self):
+        return self.array[:, 3]
+
+    @property
+    def extra_payment(self):
+        return self.array[:, 4]
+
+    @property
+    def balance(self):
+        return self.array[:, 5]
 
     def __repr__(self):
         """String representation of the amortization table."""
-        return self._format_table(self.schedule)
+        return self._format_table(self.array)
+
+    def __iadd__(self, other):
+        """Adds another table's amounts into this one by period, in place."""
+        n_periods = len(other.array)
+        if n_periods > len(self.array):
+            grown = np.zeros((n_periods, 6), order="F")
+            grown[: len(self.array)] = self.array
+            grown[:, 0] = np.arange(1, n_periods + 1)
+            self.array = grown
+        elif not self.array.flags.writeable:
+            # tables from Loan.schedule share a read only cached array, copy on first write
+            self.array = self.array.copy(order="F")
+        self.array[:n_periods, 1:] += other.array[:, 1:]
+        return self
 
     def _format_table(self, rows, include_header=True):
         """Formats the amortization table for display."""
@@ -38,27 +264,24 @@ class AmortizationTable:
             )
         for row in rows:
             output.append(
-                f"{row[0]:9} | {row[1]:13.2f} | {row[2]:9.2f} | {row[3]:8.2f} | {row[4]:13.2f} | {row[5]:17.2f}"
+                f"{int(row[0]):9} | {row[1]:13.2f} | {row[2]:9.2f} | {row[3]:8.2f} | {row[4]:13.2f} | {row[5]:17.2f}"
             )
         return "\n".join(output)
     
     def print_summary(self, range_head=2, range_tail=2):
         """Prints a summary of the amortization table, truncating consistent ranges separately."""
-        if not self.schedule:
+        if not len(self.array):
             return
         
         def find_ranges(schedule):
             """Finds consistent ranges where the total payment remains the same."""
-            ranges = []
-            start = 0
-            for i in range(1, len(schedule)):
-                if schedule[i][1] != schedule[start][1]:  # Total Payment check
-                    ranges.append((start, i - 1))
-                    start = i
-            ranges.append((start, len(schedule) - 1))  # Add last range
-            return ranges
+            # a new range starts wherever the Total Payment differs from the previous row
+            changes = np.flatnonzero(np.diff(schedule[:, 1]) != 0)
+            starts = np.concatenate(([0], changes + 1))
+            ends = np.concatenate((changes, [len(schedule) - 1]))
+            return list(zip(starts.tolist(), ends.tolist()))
         
-        ranges = find_ranges(self.schedule)
+        ranges = find_ranges(self.array)
         output = []
         output.append(
             "Payment # | Total Payment | Principal | Interest | Extra Payment | Remaining Balance"
@@ -66,11 +289,11 @@ class AmortizationTable:
         
         for start, end in ranges:
             if end - start + 1 > range_head + range_tail:
-                output.extend(self._format_table(self.schedule[start:start+range_head], include_header=False).split('\n'))
+                output.extend(self._format_table(self.array[start:start+range_head], include_header=False).split('\n'))
                 output.append("...")
-                output.extend(self._format_table(self.schedule[end-range_tail+1:end+1], include_header=False).split('\n'))
+                output.extend(self._format_table(self.array[end-range_tail+1:end+1], include_header=False).split('\n'))
             else:
-                output.extend(self._format_table(self.schedule[start:end+1], include_header=False).split('\n'))
+                output.extend(self._format_table(self.array[start:end+1], include_header=False).split('\n'))
         
         print("\n".join(output))
 
@@ -78,7 +301,7 @@ class AmortizationTable:
     def _format_row(self, row):
         """Formats a row the same way as in __repr__ for consistent display and comparison."""
         return (
-            row[0],  # Payment #
+            int(row[0]),  # Payment #
             f"{row[1]:.2f}",  # Total Payment
             f"{row[2]:.2f}",  # Principal
             f"{row[3]:.2f}",  # Interest
@@ -88,32 +311,41 @@ class AmortizationTable:
         if not isinstance(other, AmortizationTable):
             return False
 
-        mismatches = []
-        for idx, (row1, row2) in enumerate(zip(self.schedule, other.schedule)):
-            formatted_row1 = self._format_row(row1)
-            formatted_row2 = self._format_row(row2)
-
-            if formatted_row1 != formatted_row2:
-                differences = []
-                labels = [
-                    "Payment #",
-                    "Total Payment",
-                    "Principal",
-                    "Interest",
-                ]
-                for label, v1, v2 in zip(labels, formatted_row1, formatted_row2):
-                    if v1 != v2:
-                        differences.append(f"{label}: Expected {v1}, got {v2}")
-
-                mismatches.append(
-                    f"Row {idx + 1} mismatch -> " + "; ".join(differences)
-                )
-
-        if mismatches:
-            print("\n".join(mismatches))
+        if len(self.array) != len(other.array):
             return False
 
-        return True
+        # payment #, total payment, principal and interest must agree to the cent,
+        # the tolerance absorbs jitter from the order adjustments were summed in
+        compared1 = self.array[:, :4]
+        compared2 = other.array[:, :4]
+        if np.allclose(compared1, compared2, rtol=0, atol=0.005):
+            return True
+
+        if not logger.isEnabledFor(logging.DEBUG):
+            return False
+
+        mismatches = []
+        labels = [
+            "Payment #",
+            "Total Payment",
+            "Principal",
+            "Interest",
+        ]
+        close = np.isclose(compared1, compared2, rtol=0, atol=0.005)
+        for idx in np.flatnonzero(~close.all(axis=1)).tolist():
+            formatted_row1 = self._format_row(compared1[idx])
+            formatted_row2 = self._format_row(compared2[idx])
+            differences = [
+                f"{label}: Expected {v1}, got {v2}"
+                for label, v1, v2, is_close in zip(labels, formatted_row1, formatted_row2, close[idx])
+                if not is_close
+            ]
+            mismatches.append(
+                f"Row {idx + 1} mismatch -> " + "; ".join(differences)
+            )
+
+        logger.debug("%s", "\n".join(mismatches))
+        return False
 
 
 class Loan:
@@ -126,13 +358,16 @@ class Loan:
 
         self.period_zero_setup()
 
+        self.loan_info = loaninfo
         self.annual_rate = loaninfo.annual_rate
         self.total_periods = loaninfo.total_periods
         self.start_period = start_period
-        self.monthly_rate = self.annual_rate / 12
+        self.monthly_rate = loaninfo.rate_per_period
         self.payment_periods = self.total_periods - start_period + 1
+        self._disc = _discount(self.monthly_rate, self.total_periods)
 
-        self.schedule = self.generate_amortization_schedule()
+        self._schedule = None
+        self._schedule_dirty = True  # schedule is generated lazily on first access
 
     def period_zero_setup(self):
         self.down_payment = self.extra_payments.get(0, 0)
@@ -142,9 +377,17 @@ class Loan:
         return (
             f"Loan(principal={self.principal:.2f}, annual_rate={self.annual_rate:.4f}, "
             f"total_periods={self.total_periods}, start_period={self.start_period}, "
-            f"monthly_payment={self.payment:.2f}, remaining_balance={self.schedule.schedule[-1][-1]:.2f})"
+            f"monthly_payment={self.payment:.2f}, remaining_balance={self.schedule.array[-1, -1]:.2f})"
         )
 
+    @property
+    def schedule(self):
+        """Amortization table, regenerated only when extra payments changed since the last access."""
+        if self._schedule_dirty:
+            self._schedule = self.generate_amortization_schedule()
+            self._schedule_dirty = False
+        return self._schedule
+
     def get_payment_for_period(self, period):
         """Retrieves the expected payment details for a given period from the amortization schedule."""
         # payments in period 0 are all extra / down payments against principal
@@ -157,149 +400,106 @@ class Loan:
                 remaining_balance=self.total_value,
             )
 
-        if period > len(self.schedule.schedule):
+        schedule = self.schedule.array
+        if not 1 <= period <= len(schedule):
             raise ValueError(f"Requested period {period} is out of range.")
 
-        # Find the row corresponding to the given period
-        for row in self.schedule.schedule:
-            if row[0] == period:
-                return PaymentDetails(
-                    total_payment=row[1],
-                    principal=row[2],
-                    interest=row[3],
-                    remaining_balance=row[5],
-                )
-
-        raise ValueError(f"No payment found for period {period}.")
+        # rows are dense and ordered by period starting at 1
+        _, total_payment, principal, interest, _, balance = schedule[period - 1].tolist()
+        return PaymentDetails(
+            total_payment=total_payment,
+            principal=principal,
+            interest=interest,
+            remaining_balance=balance,
+        )
 
     def calculate_payment(self, principal=None, payment_periods=None):
         if principal is None:
             principal = self.principal
         if payment_periods is None:
             payment_periods = self.payment_periods
-        return (self.monthly_rate * principal) / (
-            1 - (1 + self.monthly_rate) ** -payment_periods
-        )
+        return _payment(self.monthly_rate, principal, payment_periods, self._disc)
 
     def generate_amortization_schedule(self):
-        balance = self.principal
-        schedule = []
-
-        payment = self.calculate_payment()
-
-        for i in range(1, self.start_period):
-            schedule.append((i, 0, 0, 0, 0, 0))
-
-        for i in range(self.start_period, self.total_periods + 1):
-            interest = balance * self.monthly_rate
-            principal = payment - interest
-            extra_payment = self.extra_payments.get(i, 0)
-            balance -= principal + extra_payment
-            schedule.append((i, payment, principal, interest, extra_payment, balance))
-
-            if extra_payment != 0:
-                remaining_payments = self.total_periods - i
-                if remaining_payments > 0:
-                    payment = self.calculate_payment(balance, remaining_payments)
-
-        return AmortizationTable(schedule)
+        # identical loan terms and extra payments share one cached, read only table
+        extras = tuple(sorted(self.extra_payments.items()))
+        table = _amortize_cached(
+            float(self.principal), self.monthly_rate, self.total_periods, self.start_period, extras
+        )
+        return AmortizationTable(table)
 
     def add_extra_payment(self, payment: Payment):
-        self.extra_payments[payment.period] = (
-            self.extra_payments.get(payment.period, 0) + payment.amount
-        )
+        self.add_extra_payments([payment])
+
+    def add_extra_payments(self, payments: list[Payment]):
+        """Adds a batch of extra payments, regenerating the schedule once instead of per payment."""
+        for payment in payments:
+            self.extra_payments[payment.period] = (
+                self.extra_payments.get(payment.period, 0) + payment.amount
+            )
         self.period_zero_setup()  # must occur if down payment is in ledger and not constructor arg
-        self.schedule = self.generate_amortization_schedule()
+        self._schedule_dirty = True
+
+    def clone(self):
+        """Copies the loan field by field, without re-running the constructor."""
+        new = Loan.__new__(Loan)
+        new.total_value = self.total_value
+        # extra payment keys and values are immutable numbers, a dict copy is enough
+        new.extra_payments = self.extra_payments.copy()
+        new.down_payment = self.down_payment
+        new.principal = self.principal
+        new.loan_info = self.loan_info
+        new.annual_rate = self.annual_rate
+        new.total_periods = self.total_periods
+        new.start_period = self.start_period
+        new.monthly_rate = self.monthly_rate
+        new.payment_periods = self.payment_periods
+        new._disc = self._disc  # shared read only table
+        # reuse an already generated schedule instead of regenerating it in the copy
+        new._schedule_dirty = self._schedule_dirty
+        new._schedule = (
+            None if self._schedule_dirty else AmortizationTable(self._schedule.array.copy())
+        )
+        return new
 
     def __copy__(self):
         """Shallow copy constructor."""
-        return Loan(
-            LoanInfo(
-                self.annual_rate,
-                self.total_periods,
-            ),
-            self.total_value,
-            self.start_period,
-            copy.deepcopy(self.extra_payments),
-        )
+        return self.clone()
 
     def __deepcopy__(self, memo):
         """Deep copy constructor."""
-        new_copy = Loan(
-            LoanInfo(
-                self.annual_rate,
-                self.total_periods,
-            ),
-            self.total_value,
-            self.start_period,
-            copy.deepcopy(self.extra_payments, memo),
-        )
+        new_copy = self.clone()
         memo[id(self)] = new_copy
         return new_copy
 
     # get the sum of loans. Communtative, so list order doesn't matter
     @staticmethod
     def combine_loans(loans):
-        combined_schedule = {}
-
-        for loan in loans:
-            for entry in loan.schedule.schedule:
-                (
-                    payment_num,
-                    total_payment,
-                    principal,
-                    interest,
-                    extra_payment,
-                    balance,
-                ) = entry
-                if payment_num not in combined_schedule:
-                    combined_schedule[payment_num] = [0, 0, 0, 0, 0]
-
-                combined_schedule[payment_num][0] += total_payment
-                combined_schedule[payment_num][1] += principal
-                combined_schedule[payment_num][2] += interest
-                combined_schedule[payment_num][3] += extra_payment
-                combined_schedule[payment_num][4] += balance
-
-        sorted_schedule = [(k, *v) for k, v in sorted(combined_schedule.items())]
-        return AmortizationTable(sorted_schedule)
+        if not loans:
+            return AmortizationTable([])
+
+        # schedules are dense and sorted from period 1, so rows are accumulated
+        # in place by position and shorter schedules only touch their own rows
+        arrays = [loan.schedule.array for loan in loans]
+        n_periods = max(len(array) for array in arrays)
+
+        combined_schedule = np.zeros((n_periods, 6), order="F")
+        for array in arrays:
+            combined_schedule[: len(array), 1:] += array[:, 1:]
+        combined_schedule[:, 0] = np.arange(1, n_periods + 1)
+        return AmortizationTable(combined_schedule)
 
     # get the difference between loans. Not communative, accepts two posiitional args
     @staticmethod
     def subtract_loans(loan1, loan2):
-        combined_schedule = {}
-
-        # Zip the two schedules together; if one is longer, truncate to the shorter length
-        for entry1, entry2 in zip(loan1.schedule.schedule, loan2.schedule.schedule):
-            (
-                payment_num,
-                total_payment1,
-                principal1,
-                interest1,
-                extra_payment1,
-                balance1,
-            ) = entry1
-
-            (
-                _,
-                total_payment2,
-                principal2,
-                interest2,
-                extra_payment2,
-                balance2,
-            ) = entry2  # Ignore payment_num from loan2 since zip ensures alignment
-
-            # Compute differences and store in the schedule
-            combined_schedule[payment_num] = [
-                total_payment1 - total_payment2,
-                principal1 - principal2,
-                interest1 - interest2,
-                extra_payment1 - extra_payment2,
-                balance1 - balance2,
-            ]
+        array1 = loan1.schedule.array
+        array2 = loan2.schedule.array
 
-        sorted_schedule = [(k, *v) for k, v in sorted(combined_schedule.items())]
-        return AmortizationTable(sorted_schedule)
+        # if one is longer, truncate to the shorter length
+        n_periods = min(len(array1), len(array2))
+        difference = array1[:n_periods] - array2[:n_periods]
+        difference[:, 0] = array1[:n_periods, 0]
+        return AmortizationTable(difference)
 
 
 
@@ -320,8 +520,7 @@ if __name__ == "__main__":
     )
 
     print("Scenario 1: Loan (A) With Extra Payments")
-    for payment in extra_payments:
-        loan_a.add_extra_payment(payment)
+    loan_a.add_extra_payments(extra_payments)
 
     print(loan_a.schedule)
 
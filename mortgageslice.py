@@ -1,8 +1,11 @@
+import collections
 import datetime
+import logging
 from enum import Enum
-from loan import Loan, TableType
-from common import Payment, Party, Parties, LoanInfo
-import copy
+from loan import AmortizationTable, Loan, TableType
+from common import Cents, Payment, Party, Parties, LoanInfo, to_cents
+
+logger = logging.getLogger(__name__)
 
 # the idea of using the same class to represent stake and bank loans didn't pan out
 # the fixed mortgate slice type can probably be removed
@@ -17,6 +20,22 @@ class MortgageSliceType(Enum):
 class MortgageSlice:
     """Functions and state for MortgageSlice of a stake"""
 
+    __slots__ = (
+        "payer",
+        "recipient",
+        "MortgageSlice_type",
+        "mortgage_slice_loan",
+        "full_value_loan",
+        "adjusted_loan",
+        "adjustment_verification",
+        "_verification_schedule",
+        "current_period",
+        "pending_payments_by_period",
+        "_adjusted_dirty",
+        "_advance_period_handler",
+        "_add_adjustment_handler",
+    )
+
     def __init__(
         self, parties: Parties, individual_loan: Loan, mortage_slice: Loan, MortgageSlice_type: MortgageSliceType
     ):
@@ -31,16 +50,39 @@ class MortgageSlice:
         self.mortgage_slice_loan = mortage_slice # nominal slice of mortgage principal
         self.full_value_loan = individual_loan # baseline for adjusted loan without any extra payments
         self.adjusted_loan = (
-            copy.deepcopy(individual_loan)
+            individual_loan.clone()
             if MortgageSlice_type == MortgageSliceType.FLEXIBLE
             else None
         )
         self.adjustment_verification = (
             [] if MortgageSlice_type == MortgageSliceType.FLEXIBLE else None
         )
+        # running sum of the full value loan and every adjustment loan, what
+        # combine_loans over the verification list would return
+        self._verification_schedule = (
+            AmortizationTable(individual_loan.schedule.array.copy())
+            if MortgageSlice_type == MortgageSliceType.FLEXIBLE
+            else None
+        )
 
         self.current_period = 0  # process down payments before first period
-        self.pending_payments = []  # Queue of payments waiting to be applied
+        # Payments waiting to be applied, bucketed by period
+        self.pending_payments_by_period: dict[int, list[Payment]] = collections.defaultdict(list)
+
+        # set when adjustments changed since the last successful verify_adjustments
+        self._adjusted_dirty = True
+
+        # the slice type never changes, so the type specific handlers are picked
+        # once here instead of branching on the type every period. They are kept
+        # as plain functions from the class, not bound methods, so the instance
+        # holds no reference to itself and subclass overrides are respected.
+        cls = type(self)
+        if MortgageSlice_type == MortgageSliceType.FLEXIBLE:
+            self._advance_period_handler = cls._advance_period_flexible
+            self._add_adjustment_handler = cls._add_adjustment_flexible
+        else:
+            self._advance_period_handler = cls._advance_period_fixed
+            self._add_adjustment_handler = cls._reject_adjustment
 
     def accept_payment(self, payment: Payment):
         """Accepts a payment and stores it until the period advances."""
@@ -50,56 +92,71 @@ class MortgageSlice:
             )
 
         # Add payment to queue
-        self.pending_payments.append(payment)
+        self.pending_payments_by_period[payment.period].append(payment)
 
     def advance_period(self):
         """Processes payments for the current period and advances to the next."""
+        self._advance_period_handler(self)
 
-        # Sum up all payments received for the current period
-        total_paid = 0
-        for payment in self.pending_payments:
-            total_paid += payment.amount
+    def _advance_period_fixed(self):
+        """Fixed MortgageSlice: payments must match the full value loan exactly."""
+        total_paid = self._pending_total()
+        expected_payment = self.full_value_loan.get_payment_for_period(
+            self.current_period
+        )
 
-        if self.MortgageSlice_type == MortgageSliceType.FIXED:
-            # Fixed MortgageSlice: Must match exactly
-            expected_payment = self.full_value_loan.get_payment_for_period(
-                self.current_period
+        if to_cents(total_paid) != to_cents(expected_payment.total_payment):
+            raise ValueError(
+                f"Fixed MortgageSlice requires exact payment of {expected_payment.total_payment:.2f}, "
+                f"but received {total_paid:.2f}."
             )
 
-            if round(total_paid, 2) != round(expected_payment.total_payment, 2):
-                raise ValueError(
-                    f"Fixed MortgageSlice requires exact payment of {expected_payment.total_payment:.2f}, "
-                    f"but received {total_paid:.2f}."
-                )
+        self._close_period()
+
+    def _advance_period_flexible(self):
+        """Flexible MortgageSlice: the difference from the schedule is added as an extra payment."""
+        total_paid = self._pending_total()
+        expected_payment = self.adjusted_loan.get_payment_for_period(
+            self.current_period
+        )
+        # the difference is rounded once, matching round(total_paid - expected, 2)
+        difference_cents = to_cents(total_paid - expected_payment.total_payment)
+        self._apply_difference(difference_cents)
+
+        self._close_period()
 
-        elif self.MortgageSlice_type == MortgageSliceType.FLEXIBLE:
-            # Flexible MortgageSlice: Calculate difference and add as extra payment
+    def _pending_total(self) -> float:
+        """Sum of the queued payments for the current period."""
+        bucket = self.pending_payments_by_period.get(self.current_period, ())
+        return sum(payment.amount for payment in bucket)
 
-            expected_payment = self.adjusted_loan.get_payment_for_period(
-                self.current_period
+    def _apply_difference(self, difference_cents: Cents):
+        """Records the difference between paid and expected as an adjustment payment."""
+
+        # Todo: detect stake popping One case that would pop a stake is a negative down payment
+        # custom rule to detect that first, but should generalize to detecte any stake popping
+
+        period = self.current_period
+
+        if difference_cents < 0 and period < 1:
+            raise Exception(f"Down payment from {self.payer} cannot be negative")
+
+        if difference_cents != 0:
+            difference = difference_cents / 100
+            adjustment_payment = Payment(
+                amount=difference,
+                sender=self.payer,
+                recipient=self.recipient,
+                period=period,
             )
-            difference = round(total_paid - expected_payment.total_payment, 2)
-
-            # Todo: detect stake popping One case that would pop a stake is a negative down payment
-            # custom rule to detect that first, but should generalize to detecte any stake popping
-
-            if difference < 0 and self.current_period < 1:
-                raise Exception(f"Down payment from {self.payer} cannot be negative")
-
-            if difference != 0:
-                adjustment_payment = Payment(
-                    amount=difference,
-                    sender=self.payer,
-                    recipient=self.recipient,
-                    period=self.current_period,
-                )
-                print(f"adding {difference}")
-                self.add_adjustment_payment(adjustment_payment)
-
-        # Remove processed payments and advance period
-        self.pending_payments = [
-            p for p in self.pending_payments if p.period > self.current_period
-        ]
+            logger.debug("adding %s", difference)
+            self.add_adjustment_payment(adjustment_payment)
+            # verify once per period, and only when an adjustment was recorded
+            self.verify_adjustments()
+
+    def _close_period(self):
+        """Removes processed payments and advances the period."""
+        self.pending_payments_by_period.pop(self.current_period, None)
         self.current_period += 1
 
     def add_adjustment_loan(self, loan: Loan):
@@ -112,10 +169,7 @@ class MortgageSlice:
     def add_adjustment_payment(self, payment: Payment):
         """Convert an extra payment into an equivalent loan and add both."""
         generated_loan = Loan(
-            LoanInfo(
-                annual_rate=self.full_value_loan.annual_rate,
-                total_periods=self.full_value_loan.total_periods,
-            ),
+            self.full_value_loan.loan_info,
             total_value=-payment.amount,
             start_period=payment.period + 1,
         )
@@ -123,12 +177,21 @@ class MortgageSlice:
 
     def _add_adjustment(self, loan: Loan, payment: Payment):
         """Handles adding the adjustment to both adjusted loan and verification list."""
-        if self.MortgageSlice_type != MortgageSliceType.FLEXIBLE:
-            raise ValueError("Only flexible MortgageSlices can have adjustment loans.")
+        self._add_adjustment_handler(self, loan, payment)
 
+    def _add_adjustment_flexible(self, loan: Loan, payment: Payment):
+        """Flexible MortgageSlice: records the adjustment on the adjusted loan and verification list."""
+        # generating the schedule can raise (an adjustment in the last period leaves
+        # the loan no periods to pay it off), so it runs before any state changes
+        adjustment_schedule = loan.schedule
         self.adjusted_loan.add_extra_payment(payment)
         self.adjustment_verification.append(loan)
-        self.verify_adjustments()
+        self._verification_schedule += adjustment_schedule
+        self._adjusted_dirty = True  # verified by the caller or before the next table read
+
+    def _reject_adjustment(self, loan: Loan, payment: Payment):
+        """_add_adjustment for fixed MortgageSlices, which have no adjusted loan."""
+        raise ValueError("Only flexible MortgageSlices can have adjustment loans.")
 
     def get_adjustment_table(self):
         adjustments = Loan.combine_loans(self.adjustment_verification)
@@ -141,21 +204,23 @@ class MortgageSlice:
 
     def verify_adjustments(self):
         """Compares the amortization table of the adjusted loan with the adjustment verification list."""
-        adjusted_schedule = self.adjusted_loan.generate_amortization_schedule()
-        verification_schedule = Loan.combine_loans(
-            [self.full_value_loan] + self.adjustment_verification
-        )
+        if not self._adjusted_dirty:
+            return  # nothing changed since the last successful verification
+
+        adjusted_schedule = self.adjusted_loan.schedule
+        verification_schedule = self._verification_schedule
 
         if adjusted_schedule != verification_schedule:
-            print("adjusted sched")
-            print(adjusted_schedule)
-            print("combined verification")
-            print(verification_schedule)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("adjusted sched\n%s", adjusted_schedule)
+                logger.debug("combined verification\n%s", verification_schedule)
 
             raise ValueError(
                 "Adjustment verification failed: Amortization tables do not match."
             )
 
+        self._adjusted_dirty = False
+
     def get_amortization_schedule(self, tabletype):
         """Returns the amortization schedule after verification."""
 
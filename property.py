@@ -1,8 +1,12 @@
+import logging
 from mortgageslice import MortgageSlice
 from stake import Stake
 from common import Parties, Party, Payment, LoanInfo
 
 
+logger = logging.getLogger(__name__)
+
+
 class PropertyParams:
     def __init__(
         self,
@@ -28,40 +32,49 @@ class PropertyParams:
 # TODO: check for consistency between them
 
 class Property:
+    __slots__ = (
+        "stakeholders",
+        "common_fund",
+        "parties",
+        "loan_info",
+        "stakes",
+        "mortgage_slices",
+    )
+
     def __init__(self, params: PropertyParams):
         """
         Initializes a mortgage with multiple stakeholders, distributing the loan proportionally.
 
         :param params: PropertyParams object containing configuration details.
         """
+        # dict.fromkeys drops duplicates in one pass and keeps the input order,
+        # so stakeholders are always processed in a deterministic order
         self.stakeholders = {
-            party.name: party for party in set(params.stakeholders) if party.type != "Common Party"
+            party.name: party
+            for party in dict.fromkeys(params.stakeholders)
+            if party.type != "Common Party"
         }
 
         self.common_fund = Party("Common Fund", "Common Party")
-        self.parties = {
-            name: Parties(self.stakeholders[name], self.common_fund)
-            for name in self.stakeholders
-        }
 
         stake_value = params.purchase_cost / len(self.stakeholders)
         stake_debt = (params.purchase_cost - params.purchase_down_payment) / len(self.stakeholders)
 
         self.loan_info = params.loan_info
 
-        self.stakes = {
-            stakeholders: Stake(
+        # build parties, stakes and mortgage slices in a single pass over the stakeholders
+        self.parties, self.stakes, self.mortgage_slices = {}, {}, {}
+        for name, stakeholder in self.stakeholders.items():
+            parties = Parties(stakeholder, self.common_fund)
+            stake = Stake(
                 baseline_value=stake_value,
                 loan_principal=stake_debt,
-                parties=self.parties[stakeholders],
+                parties=parties,
                 mortgage_info=self.loan_info,
             )
-            for stakeholders in self.stakeholders
-        }
-
-        self.mortgage_slices = {
-            name: stake.mortgage_slice for name, stake in self.stakes.items()
-        }
+            self.parties[name] = parties
+            self.stakes[name] = stake
+            self.mortgage_slices[name] = stake.mortgage_slice
 
         # Process down payments
         for name, amount in params.stakeholder_down_payments.items():
@@ -78,13 +91,18 @@ class Property:
         payment = Payment(
             amount, self.stakeholders[stakeholder.name], self.common_fund, period
         )
-        print(f"accepting payment for {stakeholder}")
+        logger.debug("accepting payment for %s", stakeholder)
         self.mortgage_slices[stakeholder.name].accept_payment(payment)
 
     def advance_period(self):
         """Advances all obligations by one period."""
-        print('advancing period')
-        for mortgage_slice in self.mortgage_slices.values():
+        logger.debug("advancing period")
+        mortgage_slices = self.mortgage_slices.values()
+        # payments are routed by period, every slice must be on the same one
+        periods = {mortgage_slice.current_period for mortgage_slice in mortgage_slices}
+        if len(periods) > 1:
+            raise ValueError(f"Mortgage slices are on different periods: {sorted(periods)}")
+        for mortgage_slice in mortgage_slices:
             mortgage_slice.advance_period()
 
     def get_amortization_schedule(self, tabletype):
@@ -7,6 +7,8 @@ from mortgageslice import MortgageSlice, MortgageSliceType
 class Stake:
     """Defines a co-owner’s stake in the mortgage collaboration."""
 
+    __slots__ = ("baseline_value", "loan_principal", "parties", "mortgage_slice")
+
     def __init__(
         self,
         baseline_value: float,
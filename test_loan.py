@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+import loan
+
+
+def reference_schedule(principal, rate, total_periods, start_period, extra_payments):
+    """The original period by period amortization loop."""
+    balance = principal
+    schedule = []
+
+    payment = (rate * principal) / (1 - (1 + rate) ** -(total_periods - start_period + 1))
+
+    for i in range(1, start_period):
+        schedule.append((i, 0, 0, 0, 0, 0))
+
+    for i in range(start_period, total_periods + 1):
+        interest = balance * rate
+        principal_paid = payment - interest
+        extra_payment = extra_payments.get(i, 0)
+        balance -= principal_paid + extra_payment
+        schedule.append((i, payment, principal_paid, interest, extra_payment, balance))
+
+        if extra_payment != 0:
+            remaining_payments = total_periods - i
+            if remaining_payments > 0:
+                payment = (rate * balance) / (1 - (1 + rate) ** -remaining_payments)
+
+    return np.array(schedule, dtype=np.float64).reshape(-1, 6)
+
+
+# principal, rate, total_periods, start_period, extra_payments
+CASES = [
+    (75000, 0.5 / 12, 10, 1, {3: -3000, 5: 5000}),
+    (430000, 0.06 / 12, 360, 1, {1: 500, 2: -200.25, 60: 10000, 359: 100}),
+    (-1000, 0.06 / 12, 360, 37, {40: 50.5, 200: -25}),
+    (-100, 0.05 / 12, 10, 10, {}),  # starts in the last period
+]
+
+# cases the reference loop raises ZeroDivisionError on
+FAILING_CASES = [
+    (-100, 0.05 / 12, 10, 11, {}),  # starts after the last period
+    (1000, 0.0, 12, 1, {}),  # zero rate
+]
+
+
+def numba_schedule(kernel, principal, rate, total_periods, start_period, extra_payments):
+    extras = tuple(sorted(extra_payments.items()))
+    return loan._kernel_schedule(kernel, principal, rate, total_periods, start_period, extras)
+
+
+class ScheduleBackendTests(unittest.TestCase):
+    """Both schedule backends must match the reference loop to the cent."""
+
+    def check_backend(self, schedule_function):
+        for case in CASES:
+            with self.subTest(case=case):
+                table = schedule_function(*case)
+                np.testing.assert_allclose(table, reference_schedule(*case), rtol=0, atol=0.005)
+        for case in FAILING_CASES:
+            with self.subTest(case=case):
+                with self.assertRaises(ZeroDivisionError):
+                    reference_schedule(*case)
+                with self.assertRaises(ZeroDivisionError):
+                    schedule_function(*case)
+
+    def test_numpy_schedule(self):
+        self.check_backend(loan._vectorized_schedule)
+
+    def test_numba_schedule(self):
+        try:
+            kernel = loan._compile_kernel()
+        except ImportError:
+            self.skipTest("numba is not installed")
+        self.check_backend(lambda *case: numba_schedule(kernel, *case))
+
+
+if __name__ == "__main__":
+    unittest.main()